@@ -11,8 +11,130 @@ import sys
 import yaml
 import argparse
 import re
+import functools
+import hashlib
+import json
+import pickle
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, List, Union
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+# Prefer the LibYAML-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+# Template syntax patterns, compiled once and shared by every render.
+# _TMPL_RE matches, in order of precedence: {{#each}} loops (groups 1-2),
+# {{#if}} conditionals (groups 3-4), {{#unless}} blocks and {{VARIABLE}}s (group 5).
+_TMPL_RE = re.compile(
+    r'\{\{#each\s+(\w+)\}\}(.*?)\{\{/each\}\}'
+    r'|\{\{#if\s+(\w+)\}\}(.*?)\{\{/if\}\}'
+    r'|\{\{#unless.*?\}\}.*?\{\{/unless\}\}'
+    r'|\{\{([^#/][^}]*)\}\}',
+    re.DOTALL
+)
+_VAR_RE = re.compile(r'\{\{([^#/][^}]*)\}\}')
+_WS_RE = re.compile(r'\n\s*\n\s*\n')
+
+# Context arrays that templates iterate over, defaulted to empty when missing
+_ITERABLE_CONTEXT_KEYS = ('TARGET_USERS', 'VALUE_PROPOSITIONS', 'TIMELINE_PHASES', 'PERFORMANCE_TARGETS')
+
+# Directory names the framework checkout is known to use
+_FRAMEWORK_DIR_NAMES = ("copilot-autonomous-framework-standalone", "copilot-autonomous-framework")
+
+# Complex config sections that are kept as nested values in the template context
+_UNFLATTENED_SECTIONS = frozenset({'stack', 'timeline', 'users'})
+
+
+@functools.lru_cache(maxsize=64)
+def _read_template(path_str: str) -> str:
+    """Read a template file once per process"""
+    return Path(path_str).read_text()
+
+
+@functools.lru_cache(maxsize=None)
+def _find_framework_directory(base_dir: str, script_root: str, env_dir: str) -> Optional[Path]:
+    """Locate the framework directory, probing candidates in order of likelihood"""
+    current_dir = Path(script_root)
+    if current_dir.name in _FRAMEWORK_DIR_NAMES:
+        return current_dir
+    
+    # Explicit override, then paths relative to the project config
+    base_path = Path(base_dir)
+    candidates = [Path(env_dir)] if env_dir else []
+    candidates += [base_path / name for name in _FRAMEWORK_DIR_NAMES]
+    candidates += [base_path.parent / name for name in _FRAMEWORK_DIR_NAMES]
+    return next((path for path in candidates if path.is_dir()), None)
+
+
+def _write_files(writes: List[Tuple[Path, str]]):
+    """Write independent output files concurrently, re-raising the first failure"""
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda write: write[0].write_text(write[1]), writes))
+
+
+def _yaml_cache_dir() -> Optional[Path]:
+    """Return the per-user YAML cache directory, or None if it isn't private to this user"""
+    cache_root = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    cache_dir = Path(cache_root) / 'copilot-autonomous-framework' / 'yaml'
+    try:
+        cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        stat = cache_dir.stat()
+    except OSError:
+        return None
+    
+    # Only trust a directory nobody else can write to
+    if hasattr(os, 'getuid') and (stat.st_uid != os.getuid() or stat.st_mode & 0o022):
+        return None
+    return cache_dir
+
+
+def _load_yaml_cached(path: Path) -> Any:
+    """Load a YAML file, reusing a pickled copy while the file is unchanged"""
+    source = path.read_bytes()
+    stat = path.stat()
+    header = json.dumps({
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha256': hashlib.sha256(source).hexdigest()
+    }, sort_keys=True).encode() + b'\n'
+    
+    cache_dir = _yaml_cache_dir()
+    if cache_dir is None:
+        return yaml.load(source, Loader=_SafeLoader)
+    
+    path_key = hashlib.sha256(str(path.resolve()).encode()).hexdigest()
+    cache_path = cache_dir / f"{path_key}.pkl"
+    
+    # The plain-text header must match before anything is unpickled
+    try:
+        with open(cache_path, 'rb') as f:
+            if f.readline() == header:
+                return pickle.load(f)
+    except Exception:
+        pass  # Missing, stale or unreadable cache - fall back to parsing
+    
+    parsed = yaml.load(source, Loader=_SafeLoader)
+    
+    # Write the cache atomically; an unwritable cache directory just means no cache
+    try:
+        fd, tmp_name = tempfile.mkstemp(dir=cache_dir, prefix=cache_path.name, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(header)
+                pickle.dump(parsed, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, cache_path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+    except OSError:
+        pass
+    
+    return parsed
+
 
 class TemplateEngine:
     """Enhanced template engine with better variable substitution and control structures"""
@@ -23,85 +145,110 @@ class TemplateEngine:
     def render(self, template_content: str, context: Dict[str, Any]) -> str:
         """Render template with context variables"""
         self.context = context
-        result = template_content
-        
-        # Handle {{#each ARRAY}} loops
-        result = self._handle_each_loops(result, context)
         
-        # Handle {{#if CONDITION}} conditionals
-        result = self._handle_conditionals(result, context)
-        
-        # Handle simple variable substitution {{VARIABLE}}
-        result = self._substitute_variables(result, context)
+        # Handle loops, conditionals and variables in a single scan
+        result = self._render_tags(template_content, context)
         
         # Clean up any remaining template syntax
         result = self._cleanup_template_syntax(result)
         
         return result
     
+    def _render_tags(self, content: str, context: Dict[str, Any]) -> str:
+        """Handle {{#each}}, {{#if}}, {{#unless}} and {{VARIABLE}} tags in one pass"""
+        # Cheap substring checks let tag-free content skip the regex scans
+        if "{{" not in content:
+            return content
+        
+        if "{{#" not in content:
+            # No block tags, only simple variable substitution is needed
+            return self._substitute_variables(content, context)
+        
+        # Collect literal slices and rendered tags, joining them once at the end
+        parts = []
+        last = 0
+        for match in _TMPL_RE.finditer(content):
+            parts.append(content[last:match.start()])
+            last = match.end()
+            array_name, loop_content, condition_name, if_content, var_name = match.groups()
+            
+            if array_name is not None:
+                # Loop bodies may contain conditionals and variables of their own
+                loop_result = self._expand_each_loop(array_name, loop_content, context)
+                parts.append(self._render_tags(loop_result, context))
+            elif condition_name is not None:
+                # Check if condition is truthy
+                if context.get(condition_name, False):
+                    parts.append(self._render_tags(if_content, context))
+            elif var_name is not None:
+                parts.append(self._resolve_variable(var_name, context))
+            # {{#unless}} blocks are not implemented and render as nothing
+        
+        parts.append(content[last:])
+        return "".join(parts)
+    
     def _substitute_variables(self, content: str, context: Dict[str, Any]) -> str:
         """Handle simple variable substitution"""
-        def replace_var(match):
-            var_name = match.group(1).strip()
-            return str(context.get(var_name, f"{{{{ {var_name} }}}}"))  # Keep unresolved vars
-        
-        return re.sub(r'\{\{([^#/][^}]*)\}\}', replace_var, content)
+        parts = []
+        last = 0
+        for match in _VAR_RE.finditer(content):
+            parts.append(content[last:match.start()])
+            parts.append(self._resolve_variable(match.group(1), context))
+            last = match.end()
+        
+        parts.append(content[last:])
+        return "".join(parts)
     
-    def _handle_each_loops(self, content: str, context: Dict[str, Any]) -> str:
-        """Handle {{#each ARRAY}} ... {{/each}} loops"""
-        pattern = r'\{\{#each\s+(\w+)\}\}(.*?)\{\{/each\}\}'
-        
-        def replace_each(match):
-            array_name = match.group(1)
-            loop_content = match.group(2)
-            
-            if array_name not in context:
-                return ""
-            
-            array_data = context[array_name]
-            if not isinstance(array_data, list):
-                return ""
-            
-            result_parts = []
-            for item in array_data:
-                item_content = loop_content
-                
-                if isinstance(item, dict):
-                    # Replace properties with uppercase keys
-                    for key, value in item.items():
-                        item_content = item_content.replace(f"{{{{{key.upper()}}}}}", str(value))
-                elif isinstance(item, str):
-                    item_content = item_content.replace("{{this}}", item)
-                
-                result_parts.append(item_content)
-            
-            return "".join(result_parts)
-        
-        return re.sub(pattern, replace_each, content, flags=re.DOTALL)
+    def _resolve_variable(self, var_name: str, context: Dict[str, Any]) -> str:
+        """Look up a {{VARIABLE}} value, keeping unresolved variables in the output"""
+        var_name = var_name.strip()
+        return str(context.get(var_name, f"{{{{ {var_name} }}}}"))
     
-    def _handle_conditionals(self, content: str, context: Dict[str, Any]) -> str:
-        """Handle {{#if CONDITION}} ... {{/if}} conditionals"""
-        pattern = r'\{\{#if\s+(\w+)\}\}(.*?)\{\{/if\}\}'
+    def _expand_each_loop(self, array_name: str, loop_content: str, context: Dict[str, Any]) -> str:
+        """Expand a {{#each ARRAY}} ... {{/each}} loop body once per array item"""
+        if array_name not in context:
+            return ""
         
-        def replace_if(match):
-            condition_name = match.group(1)
-            if_content = match.group(2)
-            
-            # Check if condition is truthy
-            condition_value = context.get(condition_name, False)
-            if condition_value:
-                return if_content
+        array_data = context[array_name]
+        if not isinstance(array_data, list):
             return ""
         
-        return re.sub(pattern, replace_if, content, flags=re.DOTALL)
+        # Upper-case item keys once per loop; items may spell the same key
+        # with different case, so keep every original spelling per name
+        item_keys = {}
+        for item in array_data:
+            if isinstance(item, dict):
+                for key in item:
+                    spellings = item_keys.setdefault(key.upper(), [])
+                    if key not in spellings:
+                        spellings.append(key)
+        
+        # Split the body once into (text, item keys) segments; literal text has
+        # no keys and placeholders an item doesn't provide fall back to their text
+        tokens = _VAR_RE.split(loop_content)
+        segments = [
+            (token, ()) if index % 2 == 0 else (f"{{{{{token}}}}}", item_keys.get(token.strip(), ()))
+            for index, token in enumerate(tokens)
+        ]
+        
+        result_parts = []
+        for item in array_data:
+            if isinstance(item, dict):
+                for text, keys in segments:
+                    key = next((key for key in keys if key in item), None)
+                    result_parts.append(text if key is None else str(item[key]))
+            elif isinstance(item, str):
+                for text, _ in segments:
+                    result_parts.append(item if text == "{{this}}" else text)
+            else:
+                result_parts.append(loop_content)
+        
+        return "".join(result_parts)
     
     def _cleanup_template_syntax(self, content: str) -> str:
-        """Remove any remaining template syntax and clean up formatting"""
-        # Remove {{#unless}} blocks (not implemented)
-        content = re.sub(r'\{\{#unless.*?\}\}.*?\{\{/unless\}\}', '', content, flags=re.DOTALL)
-        
+        """Clean up formatting left behind by removed template blocks"""
         # Clean up extra whitespace but preserve intentional formatting
-        content = re.sub(r'\n\s*\n\s*\n', '\n\n', content)
+        content = _WS_RE.sub('\n\n', content)
         
         return content.strip()
 
@@ -115,33 +262,32 @@ class CopilotConfigGenerator:
         self.template_engine = TemplateEngine()
         self.base_dir = self.config_path.parent
         self.framework_dir = self.find_framework_directory()
+        self._stack_configs_cache = None
+        self._context_cache = None
         
     def find_framework_directory(self) -> Path:
         """Find the framework directory"""
-        current_dir = Path(__file__).parent.parent
-        if current_dir.name in ["copilot-autonomous-framework-standalone", "copilot-autonomous-framework"]:
-            return current_dir
-        
-        # Try relative paths
-        for path in [
-            self.base_dir / "copilot-autonomous-framework-standalone",
-            self.base_dir / "copilot-autonomous-framework", 
-            self.base_dir.parent / "copilot-autonomous-framework-standalone",
-            self.base_dir.parent / "copilot-autonomous-framework",
-            Path("/Users/ghanithan/work/src/personal/copilot-autonomous-framework")  # Absolute fallback
-        ]:
-            if path.exists():
-                return path
-        
-        raise FileNotFoundError("Could not find framework directory")
+        framework_dir = _find_framework_directory(
+            str(self.base_dir),
+            str(Path(__file__).parent.parent),
+            os.environ.get('CAF_FRAMEWORK_DIR', '')
+        )
+        if framework_dir is None:
+            raise FileNotFoundError("Could not find framework directory")
+        return framework_dir
     
     def load_config(self, config_path: str) -> Dict[str, Any]:
         """Load project configuration from YAML file"""
-        with open(config_path, 'r') as f:
-            return yaml.safe_load(f)
+        return _load_yaml_cached(Path(config_path))
     
     def load_stack_configs(self) -> Dict[str, Any]:
-        """Load technology stack configurations"""
+        """Load technology stack configurations (cached after the first call)"""
+        if self._stack_configs_cache is None:
+            self._stack_configs_cache = self._read_stack_configs()
+        return self._stack_configs_cache
+    
+    def _read_stack_configs(self) -> Dict[str, Any]:
+        """Read technology stack configurations referenced by the project config"""
         configs = {}
         
         # Load backend config
@@ -150,9 +296,8 @@ class CopilotConfigGenerator:
             if 'config_ref' in backend:
                 config_path = self.framework_dir / backend['config_ref']
                 if config_path.exists():
-                    with open(config_path, 'r') as f:
-                        backend_config = yaml.safe_load(f)
-                        configs.update(backend_config)
+                    backend_config = _load_yaml_cached(config_path)
+                    configs.update(backend_config)
         
         # Load frontend config
         if 'stack' in self.config and 'frontend' in self.config['stack']:
@@ -160,14 +305,19 @@ class CopilotConfigGenerator:
             if 'config_ref' in frontend:
                 config_path = self.framework_dir / frontend['config_ref']
                 if config_path.exists():
-                    with open(config_path, 'r') as f:
-                        frontend_config = yaml.safe_load(f)
-                        configs.update(frontend_config)
+                    frontend_config = _load_yaml_cached(config_path)
+                    configs.update(frontend_config)
         
         return configs
     
     def prepare_template_context(self) -> Dict[str, Any]:
-        """Prepare comprehensive context for template rendering"""
+        """Prepare comprehensive context for template rendering (cached after the first call)"""
+        if self._context_cache is None:
+            self._context_cache = self._build_context()
+        return self._context_cache
+    
+    def _build_context(self) -> Dict[str, Any]:
+        """Build the template context from the project and stack configurations"""
         stack_configs = self.load_stack_configs()
         context = {}
         
@@ -198,50 +348,59 @@ class CopilotConfigGenerator:
         return context
     
     def _flatten_config_section(self, context: Dict[str, Any], section: Dict[str, Any], prefix: str):
-        """Recursively flatten configuration sections"""
-        for key, value in section.items():
-            context_key = f"{prefix}_{key}".upper() if prefix else key.upper()
-            
-            if isinstance(value, dict) and key not in ['stack', 'timeline', 'users']:
-                # Don't flatten certain complex sections
-                self._flatten_config_section(context, value, context_key)
+        """Flatten nested configuration sections into upper-case context keys"""
+        # Resume each section's iterator after its nested sections, keeping
+        # depth-first order so later keys win collisions as they always have
+        stack = [(iter(section.items()), prefix.upper())]
+        while stack:
+            items, prefix = stack[-1]
+            for key, value in items:
+                upper_key = str(key).upper()
+                context_key = f"{prefix}_{upper_key}" if prefix else upper_key
+                
+                if isinstance(value, dict) and key not in _UNFLATTENED_SECTIONS:
+                    stack.append((iter(value.items()), context_key))
+                    break
+                
+                # Intern keys that templates look up repeatedly by name
+                context[sys.intern(context_key)] = value
             else:
-                context[context_key] = value
+                # Section exhausted, resume its parent
+                stack.pop()
     
     def _format_special_fields(self, context: Dict[str, Any]):
         """Format special fields for template rendering"""
+        # Fetch the nested sections once for the lookups below
+        architecture = context.get('ARCHITECTURE') or {}
+        quality = context.get('QUALITY') or {}
+        backend = (context.get('STACK') or {}).get('backend') or {}
+        
         # Format principles as comma-separated string
-        if 'ARCHITECTURE' in context and 'PRINCIPLES' in context['ARCHITECTURE']:
-            principles = context['ARCHITECTURE']['PRINCIPLES']
-            if isinstance(principles, list):
-                context['PRINCIPLES'] = ', '.join(principles)
+        principles = architecture.get('PRINCIPLES')
+        if isinstance(principles, list):
+            context['PRINCIPLES'] = ', '.join(principles)
         
         # Ensure arrays are available for iteration
-        for key in ['TARGET_USERS', 'VALUE_PROPOSITIONS', 'TIMELINE_PHASES', 'PERFORMANCE_TARGETS']:
-            if key not in context:
-                context[key] = []
+        for key in _ITERABLE_CONTEXT_KEYS:
+            context.setdefault(key, [])
         
         # Set default values for common template variables
-        defaults = {
-            'TEST_COVERAGE': context.get('QUALITY', {}).get('test_coverage_threshold', 90),
-            'ARCHITECTURE_PATTERN': context.get('ARCHITECTURE', {}).get('pattern', 'clean-architecture'),
-            'COMPONENT_TYPE': 'struct/function' if context.get('RUST_BACKEND') else 'class/function',
-            'INTERFACE_PATTERN': 'traits' if context.get('RUST_BACKEND') else 'interfaces',
-            'PRIMARY_LANGUAGE': context.get('STACK', {}).get('backend', {}).get('language', 'rust')
-        }
-        
-        for key, default_value in defaults.items():
-            if key not in context:
-                context[key] = default_value
+        rust_backend = context.get('RUST_BACKEND')
+        context.setdefault('TEST_COVERAGE', quality.get('test_coverage_threshold', 90))
+        context.setdefault('ARCHITECTURE_PATTERN', architecture.get('pattern', 'clean-architecture'))
+        context.setdefault('COMPONENT_TYPE', 'struct/function' if rust_backend else 'class/function')
+        context.setdefault('INTERFACE_PATTERN', 'traits' if rust_backend else 'interfaces')
+        context.setdefault('PRIMARY_LANGUAGE', backend.get('language', 'rust'))
     
     def load_template(self, template_name: str) -> str:
         """Load template file from framework"""
         template_path = self.framework_dir / "templates" / template_name
-        if not template_path.exists():
-            raise FileNotFoundError(f"Template not found: {template_path}")
         
-        with open(template_path, 'r') as f:
-            return f.read()
+        # Cached templates are served without touching the filesystem again
+        try:
+            return _read_template(str(template_path))
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Template not found: {template_path}") from None
     
     def generate_copilot_instructions(self) -> str:
         """Generate .github/copilot-instructions.md"""
@@ -259,7 +418,15 @@ class CopilotConfigGenerator:
         """Generate .github/copilot-setup-steps.yml"""
         template = self.load_template('copilot-setup-steps.template.yml')
         context = self.prepare_template_context()
-        return self.template_engine.render(template, context)
+        rendered = self.template_engine.render(template, context)
+        
+        # Validate YAML syntax on the rendered string, before it is written out
+        try:
+            yaml.load(rendered, Loader=_SafeLoader)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Generated copilot-setup-steps.yml has invalid YAML: {e}")
+        
+        return rendered
     
     def generate_claude_context(self) -> str:
         """Generate CLAUDE.md for Claude GitHub app integration"""
@@ -281,30 +448,35 @@ class CopilotConfigGenerator:
         
         context = self.prepare_template_context()
         
-        # Copy command files
+        # Render command files; they are written together below
+        writes = []
         for command_file in commands_dir.glob('*.md'):
             if command_file.name == 'README.md':
                 continue  # Skip README for now, will process separately
                 
-            template_content = command_file.read_text()
+            template_content = _read_template(str(command_file))
             rendered_content = self.template_engine.render(template_content, context)
-            
-            output_file = claude_commands_dir / command_file.name
-            output_file.write_text(rendered_content)
-            print(f"📝 Generated Claude command: {output_file}")
+            writes.append((claude_commands_dir / command_file.name, rendered_content))
         
         # Generate README for commands
         readme_path = commands_dir / 'README.md'
         if readme_path.exists():
-            readme_content = readme_path.read_text()
+            readme_content = _read_template(str(readme_path))
             rendered_readme = self.template_engine.render(readme_content, context)
-            (claude_commands_dir / 'README.md').write_text(rendered_readme)
-            print(f"📚 Generated Claude commands README: {claude_commands_dir / 'README.md'}")
+            writes.append((claude_commands_dir / 'README.md', rendered_readme))
+        
+        _write_files(writes)
+        
+        for output_file, _ in writes:
+            if output_file.name == 'README.md':
+                print(f"📚 Generated Claude commands README: {output_file}")
+            else:
+                print(f"📝 Generated Claude command: {output_file}")
     
     def generate_issue_template(self, output_dir: str = '.'):
         """Generate GitHub issue template"""
         template = self.load_template('github-issue-template.md')
-        context = self.prepare_template_context()
+        context = dict(self.prepare_template_context())
         
         # Add template-specific context
         context.update({
@@ -348,20 +520,24 @@ class CopilotConfigGenerator:
             # Generate core Copilot files
             print("📝 Generating copilot-instructions.md...")
             instructions = self.generate_copilot_instructions()
-            (github_dir / 'copilot-instructions.md').write_text(instructions)
             
             print("📋 Generating copilot-context.md...")
             context = self.generate_copilot_context()
-            (github_dir / 'copilot-context.md').write_text(context)
             
             print("⚙️  Generating copilot-setup-steps.yml...")
             setup_steps = self.generate_setup_steps()
-            (github_dir / 'copilot-setup-steps.yml').write_text(setup_steps)
             
             # Generate Claude integration files
             print("🤖 Generating CLAUDE.md...")
             claude_context = self.generate_claude_context()
-            (output_path / 'CLAUDE.md').write_text(claude_context)
+            
+            # Rendering is CPU-bound, but the writes are independent I/O
+            _write_files([
+                (github_dir / 'copilot-instructions.md', instructions),
+                (github_dir / 'copilot-context.md', context),
+                (github_dir / 'copilot-setup-steps.yml', setup_steps),
+                (output_path / 'CLAUDE.md', claude_context),
+            ])
             
             print("🔧 Generating Claude custom commands...")
             self.generate_claude_commands(output_dir)
@@ -401,13 +577,6 @@ class CopilotConfigGenerator:
             if filepath.stat().st_size == 0:
                 raise ValueError(f"Generated {filename} is empty")
         
-        # Validate YAML syntax
-        try:
-            with open(github_dir / 'copilot-setup-steps.yml', 'r') as f:
-                yaml.safe_load(f)
-        except yaml.YAMLError as e:
-            raise ValueError(f"Generated copilot-setup-steps.yml has invalid YAML: {e}")
-        
         print("✅ All generated files validated successfully")
 
 